@@ -9,7 +9,6 @@ from scipy import stats
 from sklearn.ensemble import IsolationForest
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
-import csv
 
 # Constants for anomaly detection
 ANOMALY_DETECTION_METHODS = ['zscore', 'iqr', 'isolation_forest']
@@ -273,25 +272,19 @@ def get_daily_statistics_from_csv(csv_file, date_str, column_index=1):
     dict
         Dictionary containing statistics
     """
-    values = []
-    timestamps = []
-    
     try:
-        with open(csv_file, 'r') as file:
-            reader = csv.reader(file)
-            next(reader)  # Skip header
-            
-            for row in reader:
-                try:
-                    timestamp_str = row[0]
-                    timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                    
-                    if timestamp.strftime('%Y-%m-%d') == date_str:
-                        value = float(row[column_index])
-                        values.append(value)
-                        timestamps.append(timestamp)
-                except (ValueError, IndexError):
-                    continue
+        # อ่านเฉพาะคอลัมน์เวลาและคอลัมน์ที่ต้องการด้วย pandas (แปลงข้อมูลใน C)
+        df = pd.read_csv(csv_file, usecols=[0, column_index], float_precision='round_trip')
+        
+        # กรองวันที่จากข้อความก่อน แล้วจึงแปลงเฉพาะแถวที่ตรงกัน
+        day_data = df[df.iloc[:, 0].astype(str).str[:10] == date_str]
+        day_timestamps = pd.to_datetime(day_data.iloc[:, 0], format='%Y-%m-%d %H:%M:%S',
+                                        errors='coerce')
+        day_values = pd.to_numeric(day_data.iloc[:, 1], errors='coerce')
+        valid = day_timestamps.notna() & day_values.notna()
+        
+        timestamps = list(day_timestamps[valid].dt.to_pydatetime())
+        values = day_values[valid].tolist()
     
     except Exception as e:
         print(f"Error reading CSV: {e}")
@@ -70,13 +70,13 @@ class HACHSension7Adapter(ConductivityMeterAdapter):
         """Parse HACH Sension7 data format."""
         try:
             import logging
-            logging.debug(f"HACHSension7Adapter parsing: {repr(raw_data)}")
+            logging.debug("HACHSension7Adapter parsing: %r", raw_data)
             
             # เริ่มต้นทำความสะอาดข้อมูล
             cleaned_data = raw_data.strip().replace('\x00', '')
             
             # ข้อความแบบต่างๆ ที่อาจมาจากเครื่อง Sension7 เวลากด Print
-            logging.debug(f"Cleaned data: {repr(cleaned_data)}")
+            logging.debug("Cleaned data: %r", cleaned_data)
             
             # ลองหาแพทเทิร์นหลักๆ จากข้อมูล
             patterns = [
@@ -101,7 +101,7 @@ class HACHSension7Adapter(ConductivityMeterAdapter):
                 match = re.search(pattern, cleaned_data, re.IGNORECASE | re.DOTALL)
                 if match:
                     groups = match.groups()
-                    logging.debug(f"Matched pattern with groups: {groups}")
+                    logging.debug("Matched pattern with groups: %s", groups)
                     
                     if len(groups) >= 1:  # มีค่าการนำไฟฟ้า
                         value_str = groups[0]
@@ -127,10 +127,10 @@ class HACHSension7Adapter(ConductivityMeterAdapter):
                         
                         try:
                             value = float(value_str)
-                            logging.debug(f"Parsed values: {value}, {unit}, {temp_value}")
+                            logging.debug("Parsed values: %s, %s, %s", value, unit, temp_value)
                             return value, unit, temp_value
                         except ValueError as ve:
-                            logging.error(f"Cannot convert value to float: {value_str} - {ve}")
+                            logging.error("Cannot convert value to float: %s - %s", value_str, ve)
                             continue  # ลองแพทเทิร์นถัดไป
             
             # ถ้าไม่พบแพทเทิร์นที่รองรับ ลองหาตัวเลขแบบง่ายมากๆ
@@ -141,18 +141,18 @@ class HACHSension7Adapter(ConductivityMeterAdapter):
             if simple_match:
                 try:
                     value = float(simple_match.group(1))
-                    logging.debug(f"Found simple numeric value: {value}")
+                    logging.debug("Found simple numeric value: %s", value)
                     # สมมติว่าเป็น uS/cm ถ้าไม่มีหน่วยระบุ
                     return value, "uS/cm", None
                 except ValueError as ve:
-                    logging.error(f"Cannot convert simple value to float: {simple_match.group(1)} - {ve}")
+                    logging.error("Cannot convert simple value to float: %s - %s", simple_match.group(1), ve)
                 
-            logging.warning(f"Could not match any pattern in: {cleaned_data}")
+            logging.warning("Could not match any pattern in: %s", cleaned_data)
             return None, None, None
             
         except Exception as e:
             import logging
-            logging.error(f"Error parsing HACH Sension7 data: {e}", exc_info=True)
+            logging.error("Error parsing HACH Sension7 data: %s", e, exc_info=True)
             return None, None, None
     
     def get_command_string(self):
@@ -1,6 +1,11 @@
 """Utility functions for GUI application."""
 
 import csv
+import io
+import os
+import re
+import threading
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -39,23 +44,99 @@ def configure_thai_font():
     print("Could not find Thai-compatible font, using system default")
     return None
 
+# Maximum number of (date, file version) results kept by read_csv_data
+DATA_CACHE_MAX_ENTRIES = 64
+
 # Global cache for storing data to reduce CSV reading operations
 _data_cache = {
     'all_dates': None,  # Cache for available dates
-    'data_by_date': {},  # Cache for data by date {date_str: (timestamps, conductivities, temperatures, unit)}
+    'data_by_date': OrderedDict(),  # LRU cache {(date_str, size, mtime_ns): (timestamps, conductivities, temperatures, unit)}
     'last_update_time': None,  # Last time the CSV was modified
     'csv_file_size': 0,  # Size of CSV file to detect changes
 }
 
+# Column positions in the CSV log (Timestamp, Conductivity, Unit, Temperature)
+TS_IDX, COND_IDX, UNIT_IDX, TEMP_IDX = 0, 1, 2, 3
+
+_DATE_PREFIX = re.compile(rb'\d{4}-\d{2}-\d{2}')
+
+# Byte-offset index of the CSV log, built once and extended as rows are appended
+_date_index = {
+    'spans': {},  # {date_str: [(start_offset, end_offset), ...]}
+    'offset': 0,  # Number of bytes already indexed
+    'tail': b'',  # Last indexed line, used to detect a rewritten file
+}
+# The serial thread (via update_gui) and the Tk thread both update the index
+_date_index_lock = threading.Lock()
+
+def _reset_date_index():
+    """Forget the byte-offset index so the next lookup rebuilds it."""
+    _date_index['spans'] = {}
+    _date_index['offset'] = 0
+    _date_index['tail'] = b''
+
+def _update_date_index():
+    """
+    Bring the date index up to date with the CSV file and return it.
+    
+    The log is append-only, so only bytes written since the last call are
+    scanned. Each date maps to the byte ranges holding its rows, which lets
+    read_csv_data seek straight to them instead of parsing the whole file.
+    The returned mapping is never modified afterwards.
+    """
+    with _date_index_lock:
+        size = os.path.getsize(LOG_FILE)
+        
+        with open(LOG_FILE, 'rb') as file:
+            # Rebuild from scratch if the file shrank or was rewritten
+            offset = _date_index['offset']
+            tail = _date_index['tail']
+            if size < offset:
+                _reset_date_index()
+            elif tail:
+                file.seek(offset - len(tail))
+                if file.read(len(tail)) != tail:
+                    _reset_date_index()
+            
+            if size == _date_index['offset']:
+                return _date_index['spans']
+            
+            # Extend a copy and publish spans, tail and offset together
+            spans = {date: list(ranges) for date, ranges in _date_index['spans'].items()}
+            tail = _date_index['tail']
+            pos = _date_index['offset']
+            file.seek(pos)
+            for line in file:
+                # Leave a partially written last line for the next update
+                if not line.endswith(b'\n'):
+                    break
+                end = pos + len(line)
+                if _DATE_PREFIX.match(line):
+                    date_spans = spans.setdefault(line[:10].decode('ascii'), [])
+                    if date_spans and date_spans[-1][1] == pos:
+                        date_spans[-1] = (date_spans[-1][0], end)
+                    else:
+                        date_spans.append((pos, end))
+                tail = line
+                pos = end
+        
+        _date_index['spans'] = spans
+        _date_index['tail'] = tail
+        _date_index['offset'] = pos
+    
+    return spans
+
 def clear_cache():
     """Clear the data cache to force fresh data load"""
     global _data_cache
     _data_cache = {
         'all_dates': None,
-        'data_by_date': {},
+        'data_by_date': OrderedDict(),
         'last_update_time': None,
         'csv_file_size': 0,
     }
+    with _date_index_lock:
+        _reset_date_index()
 
 def _is_csv_changed():
     """Check if CSV file has been modified since last read"""
@@ -83,15 +164,8 @@ def get_available_dates(force_refresh=False):
     if not force_refresh and _data_cache['all_dates'] is not None and not _is_csv_changed():
         return _data_cache['all_dates']
         
-    available_dates = set()
     try:
-        with open('sension7_data.csv', 'r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                timestamp = datetime.strptime(row['Timestamp'], '%Y-%m-%d %H:%M:%S')
-                available_dates.add(timestamp.strftime('%Y-%m-%d'))
-        
-        dates_list = sorted(list(available_dates))
+        dates_list = sorted(_update_date_index())
         _data_cache['all_dates'] = dates_list
         return dates_list
     except Exception as e:
@@ -205,9 +279,18 @@ def read_csv_data(date_str, force_refresh=False):
     """Read data from CSV file for given date with caching."""
     global _data_cache
     
+    # Key on the file's size and mtime so any append invalidates the entry
+    try:
+        st = os.stat(LOG_FILE)
+        cache_key = (date_str, st.st_size, st.st_mtime_ns)
+    except OSError:
+        cache_key = None
+    
     # Return cached data if available and CSV hasn't changed
-    if not force_refresh and date_str in _data_cache['data_by_date'] and not _is_csv_changed():
-        return _data_cache['data_by_date'][date_str]
+    data_by_date = _data_cache['data_by_date']
+    if not force_refresh and cache_key in data_by_date:
+        data_by_date.move_to_end(cache_key)
+        return data_by_date[cache_key]
     
     timestamps = []
     conductivities = []
@@ -215,19 +298,30 @@ def read_csv_data(date_str, force_refresh=False):
     unit = "uS/cm"
     
     try:
-        with open('sension7_data.csv', 'r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                timestamp = datetime.strptime(row['Timestamp'], '%Y-%m-%d %H:%M:%S')
-                if timestamp.strftime('%Y-%m-%d') == date_str:
+        spans = _update_date_index().get(date_str, [])
+        with open(LOG_FILE, 'rb') as file:
+            for start, end in spans:
+                # Only read the byte ranges that hold rows for this date
+                file.seek(start)
+                chunk = file.read(end - start).decode('utf-8', errors='replace')
+                for row in csv.reader(io.StringIO(chunk)):
+                    try:
+                        timestamp = datetime.strptime(row[TS_IDX], '%Y-%m-%d %H:%M:%S')
+                        conductivity = float(row[COND_IDX])
+                        temperature = float(row[TEMP_IDX]) if row[TEMP_IDX] else None
+                    except (ValueError, IndexError):
+                        continue
                     timestamps.append(timestamp)
-                    conductivities.append(float(row['Conductivity']))
-                    temperatures.append(float(row['Temperature']) if row['Temperature'] else None)
-                    unit = row['Unit']
+                    conductivities.append(conductivity)
+                    temperatures.append(temperature)
+                    unit = row[UNIT_IDX]
         
         # Cache the results
         result = (timestamps, conductivities, temperatures, unit)
-        _data_cache['data_by_date'][date_str] = result
+        if cache_key is not None:
+            data_by_date[cache_key] = result
+            while len(data_by_date) > DATA_CACHE_MAX_ENTRIES:
+                data_by_date.popitem(last=False)
         return result
         
     except Exception as e:
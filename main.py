@@ -11,18 +11,21 @@ from datetime import datetime
 from config_manager import initialize_config, get_config
 from serial_reader import (
     MOCK_DATA_MODE, SERIAL_PORT, BAUD_RATE, TIMEOUT, DEVICE_MODEL,
-    read_and_process_data, save_to_csv
+    read_and_process_data, save_to_csv, setup_logging
 )
 from gui_app import setup_gui, update_gui, run_gui
 from gui_settings import SettingsDialog
 from gui_config import selected_date_str  # Updated import
 
+# Console line printed for every new reading
+DATA_POINT_FMT = "[%s] Conductivity: %s %s, Temp: %s°C"
+
 def on_new_data(timestamp, conductivity, unit, temperature=None):
     """
     Callback function for handling new data from the serial reader.
     Updates GUI and logs data to CSV file.
     """
-    print(f"[{timestamp}] Conductivity: {conductivity} {unit}, Temp: {temperature}°C")
+    print(DATA_POINT_FMT % (timestamp, conductivity, unit, temperature))
     
     current_date = timestamp.strftime("%Y-%m-%d")
     if current_date == selected_date_str:
@@ -43,6 +46,8 @@ def show_settings_dialog(root_window):
 
 def main():
     """Main program entry point."""
+    setup_logging()
+    
     # Initialize configuration
     initialize_config()
     config = get_config()
@@ -82,17 +87,14 @@ def main():
         file_menu.add_separator()
         file_menu.add_command(label="ออกจากโปรแกรม", command=main_window.quit)
     
-    # Check filesystem permissions and create directories
-    from serial_reader import ensure_log_directory_exists, check_filesystem_permissions
-    
-    # Run diagnostic checks and ensure directories exist
+    # Make sure the log directory is usable before resolving the log path;
+    # this may switch log_directory in the config, so it runs here on the
+    # main thread before the serial thread starts. The permission report
+    # runs on the serial thread so it does not delay GUI startup.
+    from serial_reader import ensure_log_directory_exists, get_log_file_path
     ensure_log_directory_exists()
     
-    # Check detailed filesystem permissions
-    check_filesystem_permissions()
-    
     # Update log file path with proper path from config
-    from serial_reader import get_log_file_path
     log_file_path = get_log_file_path()
     print(f"Using log file: {log_file_path}")
     
@@ -13,45 +13,59 @@ import csv
 import re
 import os
 import random  # Add import for random number generation
+import numpy as np
 import logging  # เพิ่ม logging เพื่อดี bug ได้ง่ายขึ้น
 import sys
 import tempfile
+import mmap
+import stat
+import atexit
+import threading
+from collections import namedtuple
+from enum import IntEnum
 
-# ตรวจสอบและสร้างไฟล์ log ในตำแหน่งที่เขียนได้
-try:
-    # พยายามใช้โฟลเดอร์ logs ในไดเรกทอรีของแอป
-    app_dir = os.path.dirname(os.path.abspath(__file__))
-    log_dir = os.path.join(app_dir, "logs")
+# ไดเรกทอรีของแอป (คำนวณครั้งเดียวตอน import)
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def setup_logging():
+    """
+    Configure the root logger with the debug log file and console output.
     
-    # สร้างโฟลเดอร์ถ้าไม่มี
-    if not os.path.exists(log_dir):
+    Called by the application entry points rather than at import time, so
+    modules that merely import this one do not pay for logging handlers.
+    """
+    # ตรวจสอบและสร้างไฟล์ log ในตำแหน่งที่เขียนได้
+    try:
+        # พยายามใช้โฟลเดอร์ logs ในไดเรกทอรีของแอป
+        log_dir = os.path.join(APP_DIR, "logs")
+    
+        # สร้างโฟลเดอร์ถ้าไม่มี (makedirs ตรวจสอบเองว่ามีอยู่แล้วหรือไม่)
         try:
-            os.makedirs(log_dir)
+            os.makedirs(log_dir, exist_ok=True)
             log_file = os.path.join(log_dir, "serial_debug.log")
         except:
             # หากไม่สามารถสร้างโฟลเดอร์ logs ได้ ให้ใช้ไดเรกทอรีของแอป
-            log_file = os.path.join(app_dir, "serial_debug.log")
-    else:
-        log_file = os.path.join(log_dir, "serial_debug.log")
+            log_file = os.path.join(APP_DIR, "serial_debug.log")
 
-    # ทดสอบเขียนไฟล์
-    with open(log_file, 'a'):
-        pass
-except:
-    # หากไม่สามารถเขียนในไดเรกทอรีหลักได้ ให้ใช้โฟลเดอร์ temporary
-    log_file = os.path.join(tempfile.gettempdir(), "condensate_serial_debug.log")
-    print(f"Cannot write to app directory, using temp file: {log_file}")
-
-# ตั้งค่า logging สำหรับแสดงข้อมูล debug
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
-)
-logging.info(f"Logging initialized. Log file: {log_file}")
+        # ทดสอบเขียนไฟล์
+        with open(log_file, 'a'):
+            pass
+    except:
+        # หากไม่สามารถเขียนในไดเรกทอรีหลักได้ ให้ใช้โฟลเดอร์ temporary
+        log_file = os.path.join(tempfile.gettempdir(), "condensate_serial_debug.log")
+        print(f"Cannot write to app directory, using temp file: {log_file}")
+
+    # ตั้งค่า logging สำหรับแสดงข้อมูล debug
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file),
+            logging.StreamHandler()
+        ]
+    )
+    logging.info("Logging initialized. Log file: %s", log_file)
+    return log_file
 
 # Import configuration and adapter modules
 from config_manager import get_config
@@ -81,6 +95,33 @@ MAX_MOCK_VALUE = 500.0
 MIN_MOCK_TEMP = 100.0
 MAX_MOCK_TEMP = 200.0
 SPIKE_PROBABILITY = 0.05  # 5% chance of spike in historical data
+MOCK_DECIMALS = 3  # Mock readings are rounded like a real meter display
+
+# CSV layout shared by every writer in this module
+CSV_HEADER_ROW = ['Timestamp', 'Conductivity', 'Unit', 'Temperature']
+# Rows end with \r\n, matching csv.writer in the backup and emergency files
+CSV_HEADER = b"Timestamp,Conductivity,Unit,Temperature\r\n"
+
+class LogFileStatus(IntEnum):
+    """State of the CSV log file as reported by inspect_log_file()."""
+    VALID = 0
+    MISSING = 1
+    EMPTY = 2
+    INVALID = 3
+    NO_DATA = 4
+
+LogFileInfo = namedtuple('LogFileInfo', ['status', 'size'])
+_log_file_info_cache = {}  # {path: ((mtime_ns, size), LogFileInfo)}
+_NON_BLANK = re.compile(rb'\S')
+
+# Append handles kept open across save_to_csv calls: {path: file}
+_csv_handles = {}
+
+# Per-thread bytearray reused to serialize rows before writing
+_row_buffers = threading.local()
+
+# Last get_log_file_path() result, keyed by the settings it depends on
+_log_path_cache = {'key': None, 'path': None}
 
 def parse_data(raw_data_string):
     """
@@ -91,66 +132,117 @@ def parse_data(raw_data_string):
     """
     try:
         # Log the raw data received for debugging
-        logging.debug(f"Parsing raw data: {repr(raw_data_string)}")
+        logging.debug("Parsing raw data: %r", raw_data_string)
         
         # Try to clean the data if it has garbage characters
         cleaned_data = raw_data_string.strip()
         
         # Use the device adapter to parse the data
         result = device_adapter.parse_data(cleaned_data)
-        logging.debug(f"Parse result: {result}")
+        logging.debug("Parse result: %s", result)
         return result
     except Exception as e:
-        logging.error(f"Error parsing data: {e}", exc_info=True)
+        logging.error("Error parsing data: %s", e, exc_info=True)
         return None, None, None
 
+def format_timestamp(timestamp):
+    """Format a datetime as 'YYYY-MM-DD HH:MM:SS' without going through strftime."""
+    return (f"{timestamp.year:04d}-{timestamp.month:02d}-{timestamp.day:02d} "
+            f"{timestamp.hour:02d}:{timestamp.minute:02d}:{timestamp.second:02d}")
+
+def resolve_csv_path(filename=None):
+    """Resolve the CSV file to write to, defaulting to the configured log file."""
+    # Get the file path from configuration if not specified
+    if filename is None:
+        return get_log_file_path()
+    elif not os.path.isabs(filename):
+        # If relative path, use the configured log directory
+        config = get_config()
+        log_dir = config.get('logging', 'log_directory')
+        if log_dir and os.path.exists(log_dir):
+            return os.path.join(log_dir, filename)
+        return os.path.join(os.getcwd(), filename)
+    return filename
+
+def _get_csv_file(filepath):
+    """Return a binary file object kept open for appending to filepath."""
+    csvfile = _csv_handles.get(filepath)
+    if csvfile is None:
+        # Create directory if it doesn't exist
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # Use explicit mode 'ab' for append; position starts at end of file
+        csvfile = open(filepath, 'ab', buffering=8192)
+        if csvfile.tell() == 0:
+            csvfile.write(CSV_HEADER)
+        _csv_handles[filepath] = csvfile
+    return csvfile
+
+def _csv_text(value):
+    """Return value as a CSV field, quoting it only if it needs quoting."""
+    if value is None:
+        return ''
+    value = str(value)
+    if any(ch in value for ch in ',"\r\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+def _append_csv_row(buf, data_row):
+    """Serialize a [timestamp, conductivity, unit, temperature] row into buf."""
+    timestamp_str, conductivity, unit, temperature = data_row
+    buf += (f"{timestamp_str},{_csv_text(conductivity)},"
+            f"{_csv_text(unit)},{_csv_text(temperature)}\r\n").encode('utf-8')
+
+def _get_row_buffer():
+    """Return this thread's reusable row buffer, emptied and ready for use."""
+    buf = getattr(_row_buffers, 'buf', None)
+    if buf is None:
+        buf = _row_buffers.buf = bytearray(128)
+    buf.clear()
+    return buf
+
+def close_csv_handles(filepath=None):
+    """Close the persistent CSV handle for filepath, or all of them."""
+    paths = [filepath] if filepath is not None else list(_csv_handles)
+    for path in paths:
+        csvfile = _csv_handles.pop(path, None)
+        if csvfile is not None:
+            try:
+                csvfile.close()
+            except Exception as e:
+                print(f"Error closing CSV file {path}: {e}")
+
+atexit.register(close_csv_handles)
+
 def save_to_csv(timestamp, conductivity_value, unit, temperature=None, filename=None):
     """Save measurement data to CSV file with headers if new file."""
     # Prepare data row
     data_row = [
-        timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+        format_timestamp(timestamp),
         conductivity_value,
         unit,
         temperature
     ]
     
-    # Get the file path from configuration if not specified
-    if filename is None:
-        filepath = get_log_file_path()
-    elif not os.path.isabs(filename):
-        # If relative path, use the configured log directory
-        config = get_config()
-        log_dir = config.get('logging', 'log_directory')
-        if log_dir and os.path.exists(log_dir):
-            filepath = os.path.join(log_dir, filename)
-        else:
-            filepath = os.path.join(os.getcwd(), filename)
-    else:
-        filepath = filename
+    filepath = resolve_csv_path(filename)
     
     # Try to write to the main file
     try:
-        # Create directory if it doesn't exist
-        directory = os.path.dirname(filepath)
-        if directory and not os.path.exists(directory):
-            os.makedirs(directory, exist_ok=True)
-            
-        file_exists = os.path.isfile(filepath)
-        # Use explicit mode 'a' for append
-        with open(filepath, 'a', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            if not file_exists:
-                writer.writerow(['Timestamp', 'Conductivity', 'Unit', 'Temperature'])
-            writer.writerow(data_row)
-        
-        # Verify file was written
-        if os.path.isfile(filepath):
-            return True  # Successfully wrote to the file
-        else:
-            print(f"Warning: File doesn't exist after write: {filepath}")
+        csvfile = _get_csv_file(filepath)
+        # Format straight into a reused buffer; the schema needs no csv.writer
+        buf = _get_row_buffer()
+        _append_csv_row(buf, data_row)
+        csvfile.write(buf)
+        # Flush so the GUI sees the new row straight away
+        csvfile.flush()
+        # A failed write raises IOError below, so no stat is needed to verify
+        return True  # Successfully wrote to the file
             
     except IOError as e:
         print(f"Error saving to main CSV: {e}")
+        close_csv_handles(filepath)
         
         # If main file has issues, try to save to a backup file
         try:
@@ -164,9 +256,10 @@ def save_to_csv(timestamp, conductivity_value, unit, temperature=None, filename=
             print(f"Attempting to save to backup file: {backup_filepath}")
             with open(backup_filepath, 'a', newline='') as backup_file:
                 writer = csv.writer(backup_file)
-                if not backup_exists:
-                    writer.writerow(['Timestamp', 'Conductivity', 'Unit', 'Temperature'])
-                writer.writerow(data_row)
+                if backup_exists:
+                    writer.writerow(data_row)
+                else:
+                    writer.writerows([CSV_HEADER_ROW, data_row])
             print(f"Data saved to backup file: {backup_filepath}")
             return True  # Successfully wrote to backup file
         except Exception as backup_e:
@@ -174,16 +267,16 @@ def save_to_csv(timestamp, conductivity_value, unit, temperature=None, filename=
             
             # Last resort: Try to write to user's temp directory
             try:
-                import tempfile
                 temp_dir = tempfile.gettempdir()
                 last_resort_file = os.path.join(temp_dir, "condensate_emergency_backup.csv")
                 last_resort_exists = os.path.isfile(last_resort_file)
                 
                 with open(last_resort_file, 'a', newline='') as emergency_file:
                     writer = csv.writer(emergency_file)
-                    if not last_resort_exists:
-                        writer.writerow(['Timestamp', 'Conductivity', 'Unit', 'Temperature'])
-                    writer.writerow(data_row)
+                    if last_resort_exists:
+                        writer.writerow(data_row)
+                    else:
+                        writer.writerows([CSV_HEADER_ROW, data_row])
                 print(f"Data saved to emergency backup: {last_resort_file}")
                 return True
             except Exception as e_backup:
@@ -193,37 +286,138 @@ def save_to_csv(timestamp, conductivity_value, unit, temperature=None, filename=
         print(f"Unexpected error saving to CSV: {e}")
         return False
 
-def generate_mock_historical_data(num_days=7):
+def save_rows_to_csv(data_rows, filename=None, chunk_size=1000):
+    """Append many prepared rows to the CSV file with a single flush."""
+    filepath = resolve_csv_path(filename)
+    
+    try:
+        csvfile = _get_csv_file(filepath)
+        buf = _get_row_buffer()
+        for start in range(0, len(data_rows), chunk_size):
+            buf.clear()
+            for data_row in data_rows[start:start + chunk_size]:
+                _append_csv_row(buf, data_row)
+            csvfile.write(buf)
+        csvfile.flush()
+        return True
+    except Exception as e:
+        print(f"Error saving rows to CSV: {e}")
+        close_csv_handles(filepath)
+        return False
+
+def inspect_log_file(filepath):
+    """
+    Check that a CSV log file exists, has the expected header and holds data.
+    
+    The file is memory-mapped once and only the first two lines are scanned.
+    Results are cached by modification time and size, so the startup checks
+    can all call this without touching the file again.
+    """
+    try:
+        st = os.stat(filepath)
+    except FileNotFoundError:
+        return LogFileInfo(LogFileStatus.MISSING, 0)
+    if not stat.S_ISREG(st.st_mode):
+        return LogFileInfo(LogFileStatus.MISSING, 0)
+    
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _log_file_info_cache.get(filepath)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    
+    if st.st_size == 0:
+        info = LogFileInfo(LogFileStatus.EMPTY, 0)
+    else:
+        try:
+            with open(filepath, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    header_end = mm.find(b"\n")
+                    if header_end == -1:
+                        header_end = len(mm)
+                    if mm[:header_end].rstrip(b"\r") != CSV_HEADER.rstrip(b"\r\n"):
+                        info = LogFileInfo(LogFileStatus.INVALID, st.st_size)
+                    # Blank lines may precede the first row, so look for
+                    # any non-blank byte after the header
+                    elif _NON_BLANK.search(mm, header_end + 1):
+                        info = LogFileInfo(LogFileStatus.VALID, st.st_size)
+                    else:
+                        info = LogFileInfo(LogFileStatus.NO_DATA, st.st_size)
+        except OSError as e:
+            logging.warning("Could not inspect log file %s: %s", filepath, e)
+            return LogFileInfo(LogFileStatus.INVALID, st.st_size)
+    
+    _log_file_info_cache[filepath] = (key, info)
+    return info
+
+def save_readings_to_csv(readings, filename=None):
+    """
+    Save a group of (timestamp, conductivity, unit, temperature) readings.
+    
+    All readings are written and flushed together. If that fails, each one
+    goes through save_to_csv so the backup locations are still tried.
+    """
+    data_rows = [
+        [format_timestamp(timestamp), value, unit, temperature]
+        for timestamp, value, unit, temperature in readings
+    ]
+    if save_rows_to_csv(data_rows, filename):
+        return True
+    
+    success = True
+    for timestamp, value, unit, temperature in readings:
+        success = save_to_csv(timestamp, value, unit, temperature, filename) and success
+    return success
+
+def generate_mock_historical_data(num_days=7, filename=None):
     """Generate mock historical conductivity and temperature data."""
     print(f"Generating {num_days} days of mock historical data...")
     
     end_time = datetime.now()  # Use exact current time
     start_time = end_time - timedelta(days=num_days)
-    current_time = start_time
+    span_seconds = (end_time - start_time).total_seconds()
     
-    while current_time < end_time:
-        base_value = random.uniform(MIN_MOCK_VALUE, MAX_MOCK_VALUE * 0.6)
-        temperature = random.uniform(MIN_MOCK_TEMP, MAX_MOCK_TEMP)
-        
-        if random.random() < SPIKE_PROBABILITY:
-            base_value = random.uniform(MAX_MOCK_VALUE * 0.7, MAX_MOCK_VALUE)
-        
-        unit = random.choice(["uS/cm", "mS/cm"])
-        
-        # Add random minutes and seconds
-        current_time = current_time + timedelta(
-            hours=2,
-            minutes=random.randint(0, 59),
-            seconds=random.randint(0, 59)
+    rng = np.random.default_rng()
+    
+    # Points are 2 hours apart plus random minutes and seconds; every step is
+    # at least 2 hours, which bounds how many points can fit in the span
+    max_points = int(span_seconds // (2 * 3600)) + 1
+    steps = (2 * 3600
+             + rng.integers(0, 60, max_points) * 60
+             + rng.integers(0, 60, max_points))
+    offsets = np.cumsum(steps)
+    # A point is generated while the previous one is still before end_time
+    num_points = int(np.count_nonzero(offsets - steps < span_seconds))
+    offsets = offsets[:num_points]
+    
+    base_values = rng.uniform(MIN_MOCK_VALUE, MAX_MOCK_VALUE * 0.6, num_points)
+    spikes = rng.random(num_points) < SPIKE_PROBABILITY
+    base_values[spikes] = rng.uniform(MAX_MOCK_VALUE * 0.7, MAX_MOCK_VALUE,
+                                      int(spikes.sum()))
+    temperatures = rng.uniform(MIN_MOCK_TEMP, MAX_MOCK_TEMP, num_points)
+    units = rng.choice(["uS/cm", "mS/cm"], num_points)
+    
+    data_rows = [
+        [format_timestamp(start_time + timedelta(seconds=offset)),
+         round(value, MOCK_DECIMALS), unit, round(temperature, MOCK_DECIMALS)]
+        for offset, value, unit, temperature in zip(
+            offsets.tolist(), base_values.tolist(), units.tolist(), temperatures.tolist()
         )
-        
-        save_to_csv(current_time, base_value, unit, temperature)
+    ]
     
-    print("Historical mock data generation complete")
+    # Write everything through one file handle instead of reopening per row
+    if save_rows_to_csv(data_rows, filename):
+        print("Historical mock data generation complete")
+    else:
+        print("Failed to write historical mock data")
 
 def read_and_process_data(ser_port=None, baud_rate=None, 
                          timeout=None, data_callback=None):
-    """Continuously read and process data."""
+    """
+    Continuously read and process data.
+    
+    Callers run ensure_log_directory_exists() first, before starting this
+    on a background thread, since it may update the log directory setting.
+    """
     # Use provided values or fallback to config
     ser_port = ser_port or SERIAL_PORT
     baud_rate = baud_rate or BAUD_RATE
@@ -235,39 +429,48 @@ def read_and_process_data(ser_port=None, baud_rate=None,
     ser = None
     try:
         # Run diagnostic checks before starting
-        ensure_log_directory_exists()
         check_filesystem_permissions()
         
+        # Resolve the log file once for this collection run rather than per save
+        log_path = get_log_file_path()
+        
         # Log starting configuration
-        logging.info(f"Starting serial reading with: PORT={ser_port}, BAUD={baud_rate}, TIMEOUT={timeout}")
-        logging.info(f"Using device model: {DEVICE_MODEL}")
-        logging.info(f"Log file path: {get_log_file_path()}")
+        logging.info("Starting serial reading with: PORT=%s, BAUD=%s, TIMEOUT=%s", ser_port, baud_rate, timeout)
+        logging.info("Using device model: %s", DEVICE_MODEL)
+        logging.info("Log file path: %s", log_path)
         
         # Use direct file writes to verify system is working
-        test_file = "serial_reader_test.txt"
+        # The temporary file is removed automatically when it is closed
         try:
-            with open(test_file, 'w') as f:
+            with tempfile.NamedTemporaryFile('w', dir=os.getcwd(), prefix='serial_reader_test_',
+                                             suffix='.txt') as f:
                 f.write(f"Test file created at {datetime.now()}\n")
-            logging.info(f"Successfully created test file: {test_file}")
-            logging.info(f"Using device: {DEVICE_MODEL}")
+                f.flush()
+                logging.info("Successfully created test file: %s", f.name)
+            logging.info("Using device: %s", DEVICE_MODEL)
         except Exception as e:
-            logging.warning(f"WARNING: Could not create test file: {e}")
+            logging.warning("WARNING: Could not create test file: %s", e)
         
         if MOCK_DATA_MODE:
-            if not os.path.exists(LOG_FILE) or os.path.getsize(LOG_FILE) == 0:
-                generate_mock_historical_data(num_days=7)
+            log_info = inspect_log_file(log_path)
+            # The log handle writes the header into an empty file itself, so
+            # header and history rows reach the file in the same flush
+            if log_info.status in (LogFileStatus.MISSING, LogFileStatus.EMPTY,
+                                   LogFileStatus.NO_DATA):
+                generate_mock_historical_data(num_days=7, filename=log_path)
             
             print("Running in MOCK DATA mode")
             while True:
                 try:
                     timestamp = datetime.now()  # Use exact current time
-                    mock_value = random.uniform(MIN_MOCK_VALUE, MAX_MOCK_VALUE)
-                    mock_temp = random.uniform(MIN_MOCK_TEMP, MAX_MOCK_TEMP)
+                    mock_value = round(random.uniform(MIN_MOCK_VALUE, MAX_MOCK_VALUE), MOCK_DECIMALS)
+                    mock_temp = round(random.uniform(MIN_MOCK_TEMP, MAX_MOCK_TEMP), MOCK_DECIMALS)
                     mock_unit = random.choice(["uS/cm", "mS/cm"])
                     
                     # Added try-except block inside the loop
                     try:
-                        success = save_to_csv(timestamp, mock_value, mock_unit, mock_temp)
+                        success = save_to_csv(timestamp, mock_value, mock_unit, mock_temp,
+                                              filename=log_path)
                         if success:
                             print(f"Successfully saved data point at {timestamp}")
                         else:
@@ -299,7 +502,7 @@ def read_and_process_data(ser_port=None, baud_rate=None,
             stopbits=serial.STOPBITS_ONE
         )
         
-        logging.info(f"Serial port opened successfully: {ser_port}")
+        logging.info("Serial port opened successfully: %s", ser_port)
         buffer = ""  # Buffer to accumulate incoming data
         
         while True:
@@ -307,9 +510,9 @@ def read_and_process_data(ser_port=None, baud_rate=None,
             if command_string:
                 try:
                     ser.write(command_string)
-                    logging.debug(f"Command sent: {command_string}")
+                    logging.debug("Command sent: %s", command_string)
                 except Exception as cmd_e:
-                    logging.error(f"Error sending command: {cmd_e}")
+                    logging.error("Error sending command: %s", cmd_e)
             
             # สำหรับ Sension7 เมื่อกด Print ปุ่มที่เครื่อง
             try:
@@ -318,7 +521,7 @@ def read_and_process_data(ser_port=None, baud_rate=None,
                     # อ่านข้อมูลจาก serial port
                     new_data = ser.read(ser.in_waiting).decode('utf-8', errors='ignore')
                     buffer += new_data
-                    logging.debug(f"Received data: {repr(new_data)}")
+                    logging.debug("Received data: %r", new_data)
                     
                     # ตรวจสอบว่าข้อมูลสมบูรณ์แล้วหรือไม่ (มีตัวขึ้นบรรทัดใหม่หรือไม่)
                     if '\n' in buffer:
@@ -327,34 +530,38 @@ def read_and_process_data(ser_port=None, baud_rate=None,
                         buffer = lines.pop()
                         
                         # ประมวลผลแต่ละบรรทัด
+                        readings = []
                         for line in lines:
                             if line.strip():  # ตรวจสอบว่าไม่ใช่บรรทัดว่าง
-                                logging.info(f"Processing line: {repr(line)}")
+                                logging.info("Processing line: %r", line)
                                 value, unit, temperature = parse_data(line)
                                 
                                 if value is not None:
                                     timestamp = datetime.now()
-                                    logging.info(f"Valid data received: {value} {unit}, Temp: {temperature}")
-                                    
-                                    # บันทึกข้อมูลลงไฟล์ CSV
-                                    success = save_to_csv(timestamp, value, unit, temperature)
-                                    if success:
-                                        logging.info(f"Data successfully saved to CSV at {timestamp}")
-                                    else:
-                                        logging.error("Failed to save data to CSV")
-                                    
-                                    # เรียก callback function ถ้ามี
-                                    if data_callback:
-                                        data_callback(timestamp, value, unit, temperature)
+                                    logging.info("Valid data received: %s %s, Temp: %s", value, unit, temperature)
+                                    readings.append((timestamp, value, unit, temperature))
                                 else:
-                                    logging.warning(f"Failed to parse line: {repr(line)}")
+                                    logging.warning("Failed to parse line: %r", line)
+                        
+                        if readings:
+                            # บันทึกข้อมูลทุกบรรทัดที่อ่านได้ในรอบนี้ลงไฟล์ CSV พร้อมกันครั้งเดียว
+                            success = save_readings_to_csv(readings, filename=log_path)
+                            if success:
+                                logging.info("%s reading(s) successfully saved to CSV", len(readings))
+                            else:
+                                logging.error("Failed to save data to CSV")
+                            
+                            # เรียก callback function ถ้ามี
+                            if data_callback:
+                                for reading in readings:
+                                    data_callback(*reading)
                     
                     # หากบัฟเฟอร์ยาวเกินไป (อาจมีข้อมูลที่ไม่สมบูรณ์ค้างอยู่) ให้ล้างทิ้ง
                     if len(buffer) > 1024:
-                        logging.warning(f"Buffer too long ({len(buffer)} bytes), clearing it")
+                        logging.warning("Buffer too long (%s bytes), clearing it", len(buffer))
                         buffer = ""
             except Exception as read_error:
-                logging.error(f"Error reading data: {read_error}", exc_info=True)
+                logging.error("Error reading data: %s", read_error, exc_info=True)
                 
             # รอสักครู่ก่อนอ่านข้อมูลใหม่
             time.sleep(MEASUREMENT_INTERVAL)
@@ -368,6 +575,29 @@ def read_and_process_data(ser_port=None, baud_rate=None,
             ser.close()
             print("Serial port closed")
 
+def probe_directory_writable(directory):
+    """
+    Check that a test file can be created and removed in a directory.
+    
+    Returns None when the directory is writable, otherwise the error raised.
+    """
+    # Nothing to probe if the directory is missing
+    if not os.path.isdir(directory):
+        return FileNotFoundError(f"Directory does not exist: {directory}")
+    
+    test_file = os.path.join(directory, ".write_test")
+    try:
+        # Raw descriptor: the probe needs one tiny write, not a buffered stream
+        fd = os.open(test_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, b'test')
+        finally:
+            os.close(fd)
+        os.remove(test_file)
+        return None
+    except Exception as e:
+        return e
+
 def ensure_log_directory_exists():
     """Ensure log directory exists and is writable."""
     config = get_config()
@@ -383,14 +613,11 @@ def ensure_log_directory_exists():
             print(f"Created log directory: {log_dir}")
         
         # Test writing permissions with explicit path
-        test_file = os.path.join(log_dir, ".write_test")
-        try:
-            with open(test_file, 'w') as f:
-                f.write('test')
-            os.remove(test_file)
+        write_error = probe_directory_writable(log_dir)
+        if write_error is None:
             print(f"Directory is writable: {log_dir}")
             return True
-        except Exception as write_error:
+        else:
             print(f"WARNING: Directory is not writable: {log_dir}")
             print(f"Write error: {write_error}")
             
@@ -421,59 +648,56 @@ def ensure_log_directory_exists():
 
 def check_filesystem_permissions():
     """Check permissions and state of the filesystem for the log file."""
-    print("\n--- File System Check ---")
+    # Collect the report and emit it with a single write
+    report = ["\n--- File System Check ---"]
     
     try:
         # Current working directory
         cwd = os.getcwd()
-        print(f"Current working directory: {cwd}")
-        print(f"Directory exists: {os.path.exists(cwd)}")
+        report.append(f"Current working directory: {cwd}")
+        report.append(f"Directory exists: {os.path.exists(cwd)}")
         try:
-            print(f"Directory writable: {os.access(cwd, os.W_OK)}")
+            report.append(f"Directory writable: {os.access(cwd, os.W_OK)}")
         except Exception as e:
-            print(f"Can't check directory permissions: {e}")
+            report.append(f"Can't check directory permissions: {e}")
         
-        # Check if LOG_FILE exists
-        if os.path.isabs(LOG_FILE):
-            log_path = LOG_FILE
-        else:
-            log_path = os.path.join(cwd, LOG_FILE)
+        # Check the same log file the data collection loop validates
+        log_path = get_log_file_path()
+        log_info = inspect_log_file(log_path)
         
-        print(f"Log file path: {log_path}")
-        print(f"Log file exists: {os.path.isfile(log_path)}")
+        report.append(f"Log file path: {log_path}")
+        report.append(f"Log file exists: {log_info.status != LogFileStatus.MISSING}")
         
-        if os.path.isfile(log_path):
+        if log_info.status != LogFileStatus.MISSING:
             try:
-                print(f"Log file size: {os.path.getsize(log_path)} bytes")
-                print(f"Log file readable: {os.access(log_path, os.R_OK)}")
-                print(f"Log file writable: {os.access(log_path, os.W_OK)}")
+                report.append(f"Log file size: {log_info.size} bytes")
+                report.append(f"Log file status: {log_info.status.name.lower()}")
+                report.append(f"Log file readable: {os.access(log_path, os.R_OK)}")
+                report.append(f"Log file writable: {os.access(log_path, os.W_OK)}")
             except Exception as e:
-                print(f"Can't check file permissions: {e}")
+                report.append(f"Can't check file permissions: {e}")
         
         # Check parent directory
         log_dir = os.path.dirname(log_path) or cwd
-        print(f"Log directory: {log_dir}")
-        print(f"Log directory exists: {os.path.exists(log_dir)}")
+        report.append(f"Log directory: {log_dir}")
+        report.append(f"Log directory exists: {os.path.exists(log_dir)}")
         try:
-            print(f"Log directory writable: {os.access(log_dir, os.W_OK)}")
+            report.append(f"Log directory writable: {os.access(log_dir, os.W_OK)}")
         except Exception as e:
-            print(f"Can't check directory permissions: {e}")
+            report.append(f"Can't check directory permissions: {e}")
             
         # Try to create a test file
-        try:
-            test_path = os.path.join(cwd, ".permission_test")
-            with open(test_path, 'w') as test_file:
-                test_file.write("test")
-            print(f"Successfully created test file: {test_path}")
-            os.remove(test_path)
-            print("Successfully removed test file")
-        except Exception as e:
-            print(f"Failed to create/remove test file: {e}")
+        probe_error = probe_directory_writable(cwd)
+        if probe_error is None:
+            report.append(f"Successfully created and removed test file in: {cwd}")
+        else:
+            report.append(f"Failed to create/remove test file: {probe_error}")
             
     except Exception as e:
-        print(f"Error checking filesystem: {e}")
+        report.append(f"Error checking filesystem: {e}")
     
-    print("--- End File System Check ---\n")
+    report.append("--- End File System Check ---\n")
+    sys.stdout.write("\n".join(report) + "\n")
     return
 
 # Update MOCK_DATA_MODE based on serial port availability
@@ -492,6 +716,18 @@ def get_log_file_path():
     log_file = config.get('logging', 'log_file', fallback="sension7_data.csv")
     log_dir = config.get('logging', 'log_directory')
     
+    # Reuse the last resolution while the relevant settings are unchanged
+    cache_key = (log_file, log_dir, os.getcwd())
+    if _log_path_cache['key'] == cache_key:
+        return _log_path_cache['path']
+    
+    log_path = _resolve_log_file_path(config, log_file, log_dir)
+    _log_path_cache['key'] = cache_key
+    _log_path_cache['path'] = log_path
+    return log_path
+
+def _resolve_log_file_path(config, log_file, log_dir):
+    """Work out the log file location, creating the log directory if needed."""
     # If log_dir is specified and valid, use it
     if log_dir and os.path.exists(log_dir):
         return os.path.join(log_dir, log_file)
@@ -519,6 +755,7 @@ def get_log_file_path():
 
 # Only run initialization if this module is run directly
 if __name__ == "__main__":
+    setup_logging()
     # Ensure the log directory exists at the start
     ensure_log_directory_exists()
     # Check filesystem permissions